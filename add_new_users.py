@@ -0,0 +1,121 @@
+"""
+One-off script to provision SAM UN user accounts in Supabase
+Run directly: python add_new_users.py
+"""
+import random
+import re
+import time
+
+import bcrypt
+from postgrest.exceptions import APIError
+
+from supabase_client import get_admin_supabase_client
+
+# Status codes worth retrying: rate limits and transient server errors
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+MAX_ATTEMPTS = 5
+BACKOFF_CAP_SECONDS = 32
+
+# Accounts to provision; passwords are initial values to be changed on first login
+NEW_USERS = [
+    {
+        "username": "ops_officer",
+        "password": "OpsInitial#2025",
+        "email": "ops.officer@sam-un.org",
+        "role": "user",
+    },
+    {
+        "username": "intel_analyst",
+        "password": "IntelInitial#2025",
+        "email": "intel.analyst@sam-un.org",
+        "role": "user",
+    },
+    {
+        "username": "mission_admin",
+        "password": "AdminInitial#2025",
+        "email": "mission.admin@sam-un.org",
+        "role": "admin",
+    },
+]
+
+def _execute_with_retry(build_request):
+    """Run a Supabase request, retrying rate limits and transient 5xx errors
+    with exponential backoff plus jitter."""
+    for attempt in range(MAX_ATTEMPTS):
+        try:
+            return build_request().execute()
+        except APIError as e:
+            try:
+                status = int(e.code)
+            except (TypeError, ValueError):
+                raise
+            if status not in RETRYABLE_STATUS or attempt == MAX_ATTEMPTS - 1:
+                raise
+            delay = min(2 ** attempt + random.uniform(0, 0.5), BACKOFF_CAP_SECONDS)
+            print(f"⚠️ Supabase returned {status}, retrying in {delay:.1f}s "
+                  f"(attempt {attempt + 1}/{MAX_ATTEMPTS})")
+            time.sleep(delay)
+
+# Record shape checked locally before anything hits the network, so a bad
+# row fails fast instead of costing a rejected round-trip mid-batch.
+REQUIRED_FIELDS = ("username", "password", "role")
+_USERNAME_RE = re.compile(r"^[a-z0-9_]{3,32}$")
+_EMAIL_RE = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
+VALID_ROLES = ("user", "admin")
+
+def _validate_users(users):
+    """Validate user records in-process; raises ValueError on the first bad row."""
+    for user in users:
+        for field in REQUIRED_FIELDS:
+            if not user.get(field):
+                raise ValueError(f"User record missing required field '{field}': {user.get('username')}")
+        if not _USERNAME_RE.match(user["username"]):
+            raise ValueError(f"Invalid username: {user['username']!r}")
+        if user["role"] not in VALID_ROLES:
+            raise ValueError(f"Invalid role for {user['username']}: {user['role']!r}")
+        if user.get("email") and not _EMAIL_RE.match(user["email"]):
+            raise ValueError(f"Invalid email for {user['username']}: {user['email']!r}")
+
+def _hash_passwords(users):
+    """Return copies of the user records with bcrypt-hashed passwords.
+
+    Hashing client-side keeps the CPU cost out of the request path and lets
+    authenticate_user verify against the stored hash. For provisioning runs
+    much larger than this one, the loop can move to a process pool since
+    bcrypt releases the GIL.
+    """
+    hashed = []
+    for user in users:
+        user = dict(user)
+        user["password"] = bcrypt.hashpw(
+            user["password"].encode("utf-8"), bcrypt.gensalt(rounds=10)
+        ).decode("utf-8")
+        hashed.append(user)
+    return hashed
+
+def add_new_users():
+    """Insert all pending user accounts in a single Supabase request."""
+    supabase = get_admin_supabase_client()
+    # Bind the table handle once; retries and any future per-batch calls
+    # reuse it instead of rebuilding the request builder each time.
+    users_tbl = supabase.table("users")
+
+    # One batched insert: a single HTTPS round-trip instead of one per user.
+    # ignore_duplicates makes re-runs safe when some accounts already exist,
+    # which also keeps the retry path idempotent: a retried batch can only
+    # skip rows that the interrupted attempt already wrote.
+    _validate_users(NEW_USERS)
+    new_users = _hash_passwords(NEW_USERS)
+    # returning="minimal" sends Prefer: return=minimal, so PostgREST skips
+    # re-selecting and serializing the inserted rows; the response body is
+    # discarded here anyway and success is signalled by the lack of an error.
+    _execute_with_retry(
+        lambda: users_tbl.upsert(
+            new_users, on_conflict="username", ignore_duplicates=True, returning="minimal"
+        )
+    )
+
+    print(f"✅ Provisioned {len(new_users)} users (existing accounts skipped server-side)")
+
+if __name__ == "__main__":
+    add_new_users()
@@ -0,0 +1,107 @@
+"""
+Ad-hoc analysis of the local sitreps.db
+Prints record counts, per-source breakdowns and recent activity.
+Run directly: python analyze_db.py
+"""
+import json
+import os
+from datetime import datetime, timedelta
+
+from db import DB_PATH, get_conn
+
+# Schema metadata cache so repeat runs (e.g. cron monitoring) skip the
+# PRAGMA table_info scan; invalidated when the DB file changes on disk.
+CACHE_PATH = os.path.join(os.path.dirname(__file__), ".analyze_cache.json")
+
+# Query text as module constants so repeated runs present identical SQL to
+# pysqlite's statement cache (keyed by statement text per cursor).
+_SUMMARY_SQL_TEMPLATE = (
+    "WITH s AS (SELECT source, {date_column} AS dt, "
+    "{date_column} >= ? AS recent FROM sitreps) "
+    "SELECT 'total' AS kind, NULL AS key, COUNT(*) AS value FROM s "
+    "UNION ALL SELECT 'date_range', MIN(dt), MAX(dt) FROM s "
+    "UNION ALL SELECT 'recent_total', NULL, SUM(recent) FROM s "
+    "UNION ALL SELECT 'by_source', source, COUNT(*) FROM s GROUP BY source "
+    "UNION ALL SELECT 'recent_by_source', source, COUNT(*) FROM s WHERE recent GROUP BY source"
+)
+
+_RECENT_SAMPLES_SQL_TEMPLATE = (
+    "SELECT title, severity, {date_column} AS dt FROM sitreps "
+    "ORDER BY dt DESC LIMIT 5"
+)
+
+# Pre-formatted statements per whitelisted date column: one constant SQL
+# string per column keeps the statement cache warm across invocations and
+# removes the identifier-interpolation surface from the hot path.
+QUERIES = {
+    col: (
+        _SUMMARY_SQL_TEMPLATE.format(date_column=col),
+        _RECENT_SAMPLES_SQL_TEMPLATE.format(date_column=col),
+    )
+    for col in ("created_at", "date")
+}
+
+def _get_date_column(cur):
+    """Work out which date column this copy of the DB uses, caching the
+    answer keyed by the DB file's mtime."""
+    mtime = os.path.getmtime(DB_PATH)
+    try:
+        with open(CACHE_PATH, "r", encoding="utf-8") as f:
+            cache = json.load(f)
+        if cache.get("mtime") == mtime:
+            return cache["date_column"]
+    except (OSError, ValueError, KeyError):
+        pass
+
+    cur.execute("PRAGMA table_info(sitreps)")
+    columns = [row[1] for row in cur]
+    date_column = "created_at" if "created_at" in columns else "date"
+
+    try:
+        with open(CACHE_PATH, "w", encoding="utf-8") as f:
+            json.dump({"mtime": mtime, "date_column": date_column}, f)
+    except OSError:
+        pass
+    return date_column
+
+def analyze_database():
+    """Print a summary of the sitreps table: totals, sources, recent activity."""
+    conn = get_conn()
+    cur = conn.cursor()
+
+    summary_sql, samples_sql = QUERIES[_get_date_column(cur)]
+
+    # All the count aggregates in one statement: a single parse and a single
+    # pass over the table instead of four separate scans. Rows are tagged by
+    # the first column and demultiplexed in Python.
+    two_weeks_ago = (datetime.utcnow() - timedelta(days=14)).strftime("%Y-%m-%d %H:%M:%S")
+    sections = {}
+    cur.execute(summary_sql, (two_weeks_ago,))
+    for row in cur:
+        sections.setdefault(row["kind"], []).append((row["key"], row["value"]))
+
+    total = sections["total"][0][1]
+    print(f"Total SITREPs: {total}")
+
+    print("\nBy source:")
+    for source, count in sorted(sections.get("by_source", []), key=lambda x: x[1], reverse=True):
+        print(f"  {source}: {count}")
+
+    min_date, max_date = sections["date_range"][0]
+    print(f"\nDate range: {min_date} to {max_date}")
+
+    recent_total = sections["recent_total"][0][1] or 0
+    print(f"\nLast 14 days: {recent_total} SITREPs")
+
+    print("\nLast 14 days by source:")
+    for source, count in sorted(sections.get("recent_by_source", []), key=lambda x: x[1], reverse=True):
+        print(f"  {source}: {count}")
+
+    # Most recent entries
+    print("\nMost recent entries:")
+    cur.execute(samples_sql)
+    for row in cur:
+        print(f"  [{row['severity']}] {row['title']} ({row['dt']})")
+
+if __name__ == "__main__":
+    analyze_database()
@@ -1,152 +1,217 @@
 """
 Chatbot module for SITREP database queries using OpenRouter LLM
 """
-import json
-import requests
+import math
+import re
+import numpy as np
+import orjson
+import threading
+import time
+from collections import Counter, defaultdict, deque
 from datetime import datetime, timedelta
 from typing import List, Dict, Any, Optional
 import os
 import uuid
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from llm_client import create_llm_client, LLMClient
-from supabase_client import get_sitreps, get_sitrep_by_id, get_recent_conversations, save_conversation_message
+from supabase_client import get_sitreps, get_sitrep_by_id, get_recent_conversations, queue_conversation_message, get_supabase_client
+
+# Small shared pool so independent network fetches (sitreps vs
+# conversation history) overlap instead of running back to back. This
+# stack is gevent/threading based Flask-SocketIO, so futures — not an
+# asyncio event loop — are the concurrency primitive that fits here.
+_FETCH_POOL = ThreadPoolExecutor(max_workers=4)
+
+# Intent keywords compiled into one alternation: a single C-level regex
+# scan replaces five sequential any(word in query) substring sweeps per
+# query. Priority preserves the old if/elif branch order when a query
+# mentions words from several intents.
+_INTENTS = (
+    ('recent', ('recent', 'latest', 'new', 'today')),
+    ('severity', ('critical', 'high', 'urgent')),
+    ('ongoing', ('ongoing', 'active')),
+    ('resolved', ('resolved', 'completed', 'closed')),
+    ('stats', ('statistics', 'stats', 'summary', 'overview')),
+)
+_WORD_TO_INTENT = {w: tag for tag, words in _INTENTS for w in words}
+_INTENT_PRIORITY = {tag: i for i, (tag, _) in enumerate(_INTENTS)}
+_INTENT_RE = re.compile(r'\b(' + '|'.join(w for _, words in _INTENTS for w in words) + r')\b')
+
+# Substring semantics (no word boundaries) to match the old behavior of
+# the mapping-keyword scan
+_MAPPING_RE = re.compile('|'.join(map(re.escape, (
+    'map', 'location', 'where', 'coordinates', 'lat', 'lon', 'latitude', 'longitude',
+    'plot', 'show on map', 'geographic', 'position', 'place', 'area', 'region',
+    'near', 'around', 'vicinity', 'distance', 'route', 'direction'
+))))
+
+@lru_cache(maxsize=1024)
+def _is_mapping_query_cached(query_lower: str) -> bool:
+    """Classify a lowercased query; memoized since follow-up turns often
+    repeat the identical question"""
+    return _MAPPING_RE.search(query_lower) is not None
+
+# System prompts are constants; no reason to rebuild the literals per turn
+_SYSTEM_PROMPT = """You are a helpful assistant analyzing SITREP (Situation Report) data for military/emergency operations. 
+        Your role is to analyze provided SITREP data, answer questions clearly, highlight patterns/trends, and provide actionable insights. Be factual and base responses on the provided data."""
+
+_SYSTEM_PROMPT_CONTEXT = _SYSTEM_PROMPT + """
+        
+        You have access to the conversation history to maintain context and provide more relevant responses. Reference previous exchanges when appropriate."""
+
+_STATS_SYSTEM_PROMPT = "You are analyzing SITREP database statistics. Provide a clear, informative summary of the data patterns and key insights."
+
+def _dj(obj):
+    """Pretty-print obj for prompt embedding via orjson's C serializer"""
+    return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode()
 
 class SitrepDatabase:
     """Helper class for querying SITREP database"""
     
+    # Dashboards fire the same stats/listing questions many times a
+    # minute; short TTLs absorb the repeats without hammering the store
+    STATS_TTL = 60
+    SITREPS_TTL = 30
+
     def __init__(self, db_path: str = None):
         self.db_path = db_path
         # db_path is kept for compatibility but not used with Supabase
+        self._stats_cache = (0.0, None)
+        self._sitreps_cache = {}
+        self._cache_lock = threading.Lock()
     
     def get_all_sitreps(self, limit: int = 100) -> List[Dict]:
-        """Get all SITREPs with optional limit"""
-        # Use Supabase client to get sitreps
-        sitreps = get_sitreps()
-        # Apply limit in Python since Supabase client doesn't support it directly
-        return sitreps[:limit] if sitreps else []
+        """Get all SITREPs with optional limit (cached for SITREPS_TTL seconds)"""
+        now = time.monotonic()
+        with self._cache_lock:
+            hit = self._sitreps_cache.get(limit)
+            if hit and now - hit[0] < self.SITREPS_TTL:
+                return hit[1]
+        # Limit server-side so the wire carries `limit` rows, not the table
+        resp = (get_supabase_client().table("sitreps").select("*")
+                .order("created_at", desc=True).limit(limit).execute())
+        rows = resp.data or []
+        with self._cache_lock:
+            self._sitreps_cache[limit] = (now, rows)
+        return rows
     
     def get_sitreps_by_severity(self, severity: str) -> List[Dict]:
         """Get SITREPs by severity level"""
-        # Use Supabase client to get sitreps and filter by severity
-        sitreps = get_sitreps()
-        # Filter in Python since we're not implementing custom filters in the client
-        return [s for s in sitreps if s.get('severity', '').lower() == severity.lower()]
+        # ilike with no wildcards is a case-insensitive equality filter,
+        # evaluated in Postgres instead of pulling the table down
+        resp = (get_supabase_client().table("sitreps").select("*")
+                .ilike("severity", severity)
+                .order("created_at", desc=True).limit(200).execute())
+        return resp.data or []
+    
+    def get_sitreps_by_severities(self, severities: List[str]) -> List[Dict]:
+        """Get SITREPs matching any of the given severity levels"""
+        # One or-filtered query instead of one round-trip per severity;
+        # ilike keeps the case-insensitive match of the single-level path
+        resp = (get_supabase_client().table("sitreps").select("*")
+                .or_(",".join(f"severity.ilike.{s}" for s in severities))
+                .order("created_at", desc=True).limit(200).execute())
+        return resp.data or []
     
     def get_sitreps_by_status(self, status: str) -> List[Dict]:
         """Get SITREPs by status"""
-        conn = self.get_connection()
-        cur = conn.cursor()
-        cur.execute("""
-            SELECT id, source, source_category, incident_type, title, description, 
-                   severity, status, unit, contact, lat, lon, created_at 
-            FROM sitreps 
-            WHERE LOWER(status) = LOWER(?)
-            ORDER BY created_at DESC
-        """, (status,))
-        rows = [dict(r) for r in cur.fetchall()]
-        conn.close()
-        return rows
+        resp = (get_supabase_client().table("sitreps").select("*")
+                .ilike("status", status)
+                .order("created_at", desc=True).limit(200).execute())
+        return resp.data or []
     
     def get_sitreps_by_incident_type(self, incident_type: str) -> List[Dict]:
         """Get SITREPs by incident type"""
-        conn = self.get_connection()
-        cur = conn.cursor()
-        cur.execute("""
-            SELECT id, source, source_category, incident_type, title, description, 
-                   severity, status, unit, contact, lat, lon, created_at 
-            FROM sitreps 
-            WHERE LOWER(incident_type) = LOWER(?)
-            ORDER BY created_at DESC
-        """, (incident_type,))
-        rows = [dict(r) for r in cur.fetchall()]
-        conn.close()
-        return rows
+        resp = (get_supabase_client().table("sitreps").select("*")
+                .ilike("incident_type", incident_type)
+                .order("created_at", desc=True).limit(200).execute())
+        return resp.data or []
     
     def get_recent_sitreps(self, hours: int = 24) -> List[Dict]:
         """Get SITREPs from the last N hours"""
-        # Use Supabase client to get all sitreps
-        sitreps = get_sitreps()
-        
-        # Filter by time in Python
-        cutoff_time = datetime.now() - timedelta(hours=hours)
-        
-        # Since we may not have timestamp data, return all sitreps for now
-        # In a real implementation, we would filter: 
-        # return [s for s in sitreps if s.get('timestamp') and datetime.fromisoformat(s.get('timestamp')) >= cutoff_time]
-        return sitreps[:10]  # Return first 10 as a sample
+        cutoff = (datetime.utcnow() - timedelta(hours=hours)).replace(microsecond=0)
+        resp = (get_supabase_client().table("sitreps").select("*")
+                .gte("created_at", cutoff.isoformat())
+                .order("created_at", desc=True).limit(200).execute())
+        return resp.data or []
     
     def get_sitreps_by_location(self, lat: float, lon: float, radius_km: float = 10) -> List[Dict]:
         """Get SITREPs within a certain radius of a location"""
-        conn = self.get_connection()
-        cur = conn.cursor()
-        # Simple distance calculation (not precise for large distances)
-        cur.execute("""
-            SELECT id, source, source_category, incident_type, title, description, 
-                   severity, status, unit, contact, lat, lon, created_at,
-                   (6371 * acos(cos(radians(?)) * cos(radians(lat)) * 
-                   cos(radians(lon) - radians(?)) + sin(radians(?)) * 
-                   sin(radians(lat)))) AS distance
-            FROM sitreps 
-            HAVING distance < ?
-            ORDER BY distance ASC
-        """, (lat, lon, lat, radius_km))
-        rows = [dict(r) for r in cur.fetchall()]
-        conn.close()
+        # Coarse bounding box server-side (PostgREST can't do haversine),
+        # exact great-circle refinement on the handful of rows that survive
+        lat_deg = radius_km / 111.0
+        lon_deg = radius_km / (111.0 * max(0.1, math.cos(math.radians(lat))))
+        resp = (get_supabase_client().table("sitreps").select("*")
+                .gte("lat", lat - lat_deg).lte("lat", lat + lat_deg)
+                .gte("lon", lon - lon_deg).lte("lon", lon + lon_deg)
+                .limit(500).execute())
+        rows = []
+        for s in resp.data or []:
+            try:
+                s_lat, s_lon = float(s.get('lat')), float(s.get('lon'))
+            except (TypeError, ValueError):
+                continue
+            distance = 6371 * math.acos(min(1.0, max(-1.0,
+                math.cos(math.radians(lat)) * math.cos(math.radians(s_lat)) *
+                math.cos(math.radians(s_lon) - math.radians(lon)) +
+                math.sin(math.radians(lat)) * math.sin(math.radians(s_lat)))))
+            if distance < radius_km:
+                s['distance'] = distance
+                rows.append(s)
+        rows.sort(key=lambda s: s['distance'])
         return rows
     
     def get_statistics(self) -> Dict[str, Any]:
-        """Get database statistics"""
-        conn = self.get_connection()
-        cur = conn.cursor()
-        
-        # Total count
-        cur.execute("SELECT COUNT(*) as total FROM sitreps")
-        total = cur.fetchone()['total']
-        
-        # By severity
-        cur.execute("""
-            SELECT severity, COUNT(*) as count 
-            FROM sitreps 
-            GROUP BY severity 
-            ORDER BY count DESC
-        """)
-        by_severity = [dict(r) for r in cur.fetchall()]
-        
-        # By status
-        cur.execute("""
-            SELECT status, COUNT(*) as count 
-            FROM sitreps 
-            WHERE status IS NOT NULL AND status != ''
-            GROUP BY status 
-            ORDER BY count DESC
-        """)
-        by_status = [dict(r) for r in cur.fetchall()]
-        
-        # By incident type
-        cur.execute("""
-            SELECT incident_type, COUNT(*) as count 
-            FROM sitreps 
-            WHERE incident_type IS NOT NULL AND incident_type != ''
-            GROUP BY incident_type 
-            ORDER BY count DESC
-        """)
-        by_incident_type = [dict(r) for r in cur.fetchall()]
-        
-        # Recent activity (last 24 hours)
-        cur.execute("""
-            SELECT COUNT(*) as recent_count 
-            FROM sitreps 
-            WHERE datetime(created_at) >= datetime('now', '-24 hours')
-        """)
-        recent_count = cur.fetchone()['recent_count']
-        
-        conn.close()
-        
+        """Get database statistics (cached for STATS_TTL seconds)"""
+        now = time.monotonic()
+        with self._cache_lock:
+            ts, value = self._stats_cache
+            if value is not None and now - ts < self.STATS_TTL:
+                return value
+        stats = self._compute_statistics()
+        with self._cache_lock:
+            self._stats_cache = (now, stats)
+        return stats
+
+    def _compute_statistics(self) -> Dict[str, Any]:
+        """Run the aggregate statistics queries against Supabase"""
+        supabase = get_supabase_client()
+
+        # Head-only exact counts: PostgREST answers with just the count
+        # header, no rows cross the wire
+        total = (supabase.table("sitreps").select("id", count="exact", head=True)
+                 .execute().count or 0)
+        cutoff = (datetime.utcnow() - timedelta(hours=24)).replace(microsecond=0)
+        recent_count = (supabase.table("sitreps").select("id", count="exact", head=True)
+                        .gte("created_at", cutoff.isoformat())
+                        .execute().count or 0)
+
+        # PostgREST has no GROUP BY, so pull only the three label columns
+        # and tally them here — a fraction of the full-row payload
+        resp = (supabase.table("sitreps")
+                .select("severity,status,incident_type").execute())
+        severity_counts = Counter()
+        status_counts = Counter()
+        incident_counts = Counter()
+        for row in resp.data or []:
+            severity_counts[row.get('severity')] += 1
+            status = row.get('status')
+            if status:
+                status_counts[status] += 1
+            incident_type = row.get('incident_type')
+            if incident_type:
+                incident_counts[incident_type] += 1
+
         return {
             'total_sitreps': total,
             'recent_24h': recent_count,
-            'by_severity': by_severity,
-            'by_status': by_status,
-            'by_incident_type': by_incident_type
+            'by_severity': [{'severity': k, 'count': v}
+                            for k, v in severity_counts.most_common()],
+            'by_status': [{'status': k, 'count': v}
+                          for k, v in status_counts.most_common()],
+            'by_incident_type': [{'incident_type': k, 'count': v}
+                                 for k, v in incident_counts.most_common()]
         }
 
 
@@ -162,6 +227,15 @@ class SitrepChatbot:
         if llm_config is None:
             llm_config = {}
         
+        # Rolling per-session history (5 turns) kept in memory so repeat
+        # turns skip the Supabase history round-trip; the store remains
+        # the source of truth across restarts
+        self._sessions = defaultdict(lambda: deque(maxlen=10))
+        
+        # Coordinate lists keyed by the sitrep-id tuple of the input;
+        # follow-up turns over the same result set skip the rebuild
+        self._coord_cache = {}
+        
         # Initialize LLM if client is provided via config
         client = llm_config.get('client') if isinstance(llm_config, dict) else None
         if client and isinstance(client, LLMClient):
@@ -172,12 +246,15 @@ class SitrepChatbot:
         
     def process_query(self, user_query: str, session_id: str = None) -> Dict[str, Any]:
         """Process user query and return response with data and LLM analysis"""
-        from supabase_client import get_sitreps
-        
         # Generate session ID if not provided
         if not session_id:
             session_id = str(uuid.uuid4())
         
+        # Fetch conversation history concurrently with the sitreps pull
+        # (only needed when this process hasn't seen the session yet)
+        history_future = None
+        if self.llm and not self._sessions.get(session_id):
+            history_future = _FETCH_POOL.submit(get_recent_conversations, session_id, 5)
         sitreps = get_sitreps()
         
         response = {
@@ -194,16 +271,15 @@ class SitrepChatbot:
                     user_query,
                     sitreps[:20] if sitreps else [],
                     "recent SITREPs from the database",
-                    session_id
+                    session_id,
+                    history=history_future.result() if history_future else None
                 )
                 response["llm_response"] = llm_text
+                self._remember_turn(session_id, user_query, llm_text)
+                
+                # Persisted by the background writer off the request path
+                queue_conversation_message(session_id, user_query, llm_text, orjson.dumps({"data_count": len(sitreps)}).decode())
                 
-                # Save conversation to database
-                try:
-                    save_conversation_message(session_id, user_query, llm_text, json.dumps({"data_count": len(sitreps)}))
-                except Exception as e:
-                    print(f"Warning: Failed to save conversation: {e}")
-                    
             except Exception as e:
                 response["llm_response"] = f"LLM error: {str(e)}"
         
@@ -215,8 +291,6 @@ class SitrepChatbot:
             return "LLM not configured. Please set up OpenRouter API key to enable AI responses."
         
         data_summary = self._prepare_data_summary(data)
-        system_prompt = """You are a helpful assistant analyzing SITREP (Situation Report) data for military/emergency operations. 
-        Your role is to analyze provided SITREP data, answer questions clearly, highlight patterns/trends, and provide actionable insights. Be factual and base responses on the provided data."""
         user_prompt = f"""
         User Question: {user_query}
         Context: I'm providing you with {context}.
@@ -225,31 +299,19 @@ class SitrepChatbot:
         Please analyze this data and provide a helpful response to the user's question.
         """
         messages = [
-            {"role": "system", "content": system_prompt},
+            {"role": "system", "content": _SYSTEM_PROMPT},
             {"role": "user", "content": user_prompt}
         ]
         return self.llm.chat_completion(messages)
     
-    def _generate_llm_response_with_context(self, user_query: str, data: List[Dict], context: str, session_id: str) -> str:
+    def _generate_llm_response_with_context(self, user_query: str, data: List[Dict], context: str, session_id: str, history: List[Dict] = None) -> str:
         """Generate LLM response based on query, data, and conversation history"""
         if not self.llm:
             return "LLM not configured. Please set up OpenRouter API key to enable AI responses."
         
-        # Get recent conversation history for context
-        conversation_history = get_recent_conversations(session_id, count=5)
-        
         data_summary = self._prepare_data_summary(data)
-        system_prompt = """You are a helpful assistant analyzing SITREP (Situation Report) data for military/emergency operations. 
-        Your role is to analyze provided SITREP data, answer questions clearly, highlight patterns/trends, and provide actionable insights. Be factual and base responses on the provided data.
-        
-        You have access to the conversation history to maintain context and provide more relevant responses. Reference previous exchanges when appropriate."""
-        
-        messages = [{"role": "system", "content": system_prompt}]
-        
-        # Add conversation history to messages
-        for conv in conversation_history:
-            messages.append({"role": "user", "content": conv["user_message"]})
-            messages.append({"role": "assistant", "content": conv["bot_response"]})
+        messages = [{"role": "system", "content": _SYSTEM_PROMPT_CONTEXT}]
+        messages.extend(self._history_messages(session_id, history))
         
         # Add current query with data context
         user_prompt = f"""
@@ -263,6 +325,26 @@ class SitrepChatbot:
         
         return self.llm.chat_completion(messages)
         
+    def _history_messages(self, session_id: str, history: List[Dict] = None) -> List[Dict]:
+        """Conversation history as chat messages: the in-memory session
+        deque when this process has seen the session, otherwise the
+        (possibly prefetched) Supabase history."""
+        session_msgs = self._sessions.get(session_id)
+        if session_msgs:
+            return list(session_msgs)
+        conversation_history = history if history is not None else get_recent_conversations(session_id, count=5)
+        messages = []
+        for conv in conversation_history:
+            messages.append({"role": "user", "content": conv["user_message"]})
+            messages.append({"role": "assistant", "content": conv["bot_response"]})
+        return messages
+
+    def _remember_turn(self, session_id: str, user_query: str, bot_response: str):
+        """Record a completed turn in the rolling in-memory session."""
+        turns = self._sessions[session_id]
+        turns.append({"role": "user", "content": user_query})
+        turns.append({"role": "assistant", "content": bot_response})
+
     def _generate_stats_response(self, user_query: str, stats: Dict) -> Dict[str, Any]:
         """Generate response for statistics queries"""
         if not self.llm:
@@ -274,19 +356,18 @@ class SitrepChatbot:
                 'data_count': stats.get('total_sitreps', 0)
             }
         
-        system_prompt = "You are analyzing SITREP database statistics. Provide a clear, informative summary of the data patterns and key insights."
         user_prompt = f"""
         User Question: {user_query}
         Database Statistics:
         - Total SITREPs: {stats['total_sitreps']}
         - Recent (24h): {stats['recent_24h']}
-        - By Severity: {json.dumps(stats['by_severity'], indent=2)}
-        - By Status: {json.dumps(stats['by_status'], indent=2)}
-        - By Incident Type: {json.dumps(stats['by_incident_type'], indent=2)}
+        - By Severity: {_dj(stats['by_severity'])}
+        - By Status: {_dj(stats['by_status'])}
+        - By Incident Type: {_dj(stats['by_incident_type'])}
         Please provide an analysis of these statistics.
         """
         messages = [
-            {"role": "system", "content": system_prompt},
+            {"role": "system", "content": _STATS_SYSTEM_PROMPT},
             {"role": "user", "content": user_prompt}
         ]
         llm_response = self.llm.chat_completion(messages)
@@ -303,65 +384,78 @@ class SitrepChatbot:
         if not data:
             return "No relevant SITREPs found."
         
-        summary_lines = []
-        for i, sitrep in enumerate(data, 1):
-            line = f"{i}. [{sitrep.get('severity', 'Unknown')}] {sitrep.get('title', 'No title')}"
-            if sitrep.get('description'):
-                line += f" - {sitrep['description'][:100]}{'...' if len(sitrep.get('description', '')) > 100 else ''}"
-            if sitrep.get('status'):
-                line += f" (Status: {sitrep['status']})"
-            if sitrep.get('created_at'):
-                line += f" (Created: {sitrep['created_at']})"
-            summary_lines.append(line)
-        
-        return "\n".join(summary_lines)
+        # One dict lookup per field and one string build per row instead
+        # of repeated get() calls and incremental += concatenation
+        def row(i, sitrep):
+            desc = sitrep.get('description') or ''
+            if len(desc) > 100:
+                desc = desc[:100] + '...'
+            status = sitrep.get('status')
+            created = sitrep.get('created_at')
+            return (f"{i}. [{sitrep.get('severity', 'Unknown')}] {sitrep.get('title', 'No title')}"
+                    f"{' - ' + desc if desc else ''}"
+                    f"{' (Status: ' + status + ')' if status else ''}"
+                    f"{' (Created: ' + created + ')' if created else ''}")
+        
+        return "\n".join(row(i, sitrep) for i, sitrep in enumerate(data, 1))
     
+    @staticmethod
+    def _to_float(value):
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            return np.nan
+
     def _extract_coordinates(self, data: List[Dict]) -> List[Dict]:
         """Extract valid coordinates from SITREP data for mapping"""
-        coordinates = []
+        if not data:
+            return []
+        
+        # Serve repeats from the id-keyed cache (rows without ids are not
+        # cacheable); bounded FIFO at 32 entries
+        cache_key = tuple(s.get('id') for s in data)
+        if None not in cache_key:
+            cached = self._coord_cache.get(cache_key)
+            if cached is not None:
+                return cached
+        else:
+            cache_key = None
         
-        for sitrep in data:
-            lat = sitrep.get('lat')
-            lon = sitrep.get('lon')
-            
-            # Check if coordinates are valid (not None, not empty, and numeric)
-            if lat is not None and lon is not None:
-                try:
-                    lat_float = float(lat)
-                    lon_float = float(lon)
-                    
-                    # Basic validation for reasonable coordinate ranges
-                    if -90 <= lat_float <= 90 and -180 <= lon_float <= 180:
-                        coordinates.append({
-                            'id': sitrep.get('id'),
-                            'lat': lat_float,
-                            'lon': lon_float,
-                            'title': sitrep.get('title', 'Unknown'),
-                            'severity': sitrep.get('severity', 'Unknown'),
-                            'status': sitrep.get('status', 'Unknown'),
-                            'incident_type': sitrep.get('incident_type', 'Unknown'),
-                            'description': sitrep.get('description', ''),
-                            'created_at': sitrep.get('created_at', ''),
-                            'unit': sitrep.get('unit', ''),
-                            'contact': sitrep.get('contact', '')
-                        })
-                except (ValueError, TypeError):
-                    # Skip invalid coordinates
-                    continue
+        # Coerce once into float arrays (np.nan marks bad rows), then
+        # validate every row with one vectorized mask instead of a
+        # per-row try/except and range check
+        n = len(data)
+        lats = np.fromiter((self._to_float(s.get('lat')) for s in data), dtype=np.float64, count=n)
+        lons = np.fromiter((self._to_float(s.get('lon')) for s in data), dtype=np.float64, count=n)
+        mask = (np.isfinite(lats) & np.isfinite(lons)
+                & (np.abs(lats) <= 90) & (np.abs(lons) <= 180))
         
+        coordinates = []
+        for i in np.nonzero(mask)[0]:
+            sitrep = data[i]
+            coordinates.append({
+                'id': sitrep.get('id'),
+                'lat': float(lats[i]),
+                'lon': float(lons[i]),
+                'title': sitrep.get('title', 'Unknown'),
+                'severity': sitrep.get('severity', 'Unknown'),
+                'status': sitrep.get('status', 'Unknown'),
+                'incident_type': sitrep.get('incident_type', 'Unknown'),
+                'description': sitrep.get('description', ''),
+                'created_at': sitrep.get('created_at', ''),
+                'unit': sitrep.get('unit', ''),
+                'contact': sitrep.get('contact', '')
+            })
+        
+        if cache_key is not None:
+            if len(self._coord_cache) >= 32:
+                self._coord_cache.pop(next(iter(self._coord_cache)))
+            self._coord_cache[cache_key] = coordinates
         return coordinates
     
     def _is_mapping_query(self, user_query: str) -> bool:
         """Determine if the user query is asking for location/mapping information"""
-        query_lower = user_query.lower()
-        
-        mapping_keywords = [
-            'map', 'location', 'where', 'coordinates', 'lat', 'lon', 'latitude', 'longitude',
-            'plot', 'show on map', 'geographic', 'position', 'place', 'area', 'region',
-            'near', 'around', 'vicinity', 'distance', 'route', 'direction'
-        ]
-        
-        return any(keyword in query_lower for keyword in mapping_keywords)
+        return _is_mapping_query_cached(user_query.lower())
     
     def process_query_stream(self, user_query: str, emit_callback=None, session_id: str = None) -> Dict[str, Any]:
         """Process user query with streaming LLM response"""
@@ -371,24 +465,34 @@ class SitrepChatbot:
             
         query_lower = user_query.lower()
         relevant_data = []
+        # Overlap the history fetch with the data branch below (only
+        # needed when this process hasn't seen the session yet)
+        history_future = None
+        if self.llm and not self._sessions.get(session_id):
+            history_future = _FETCH_POOL.submit(get_recent_conversations, session_id, 5)
         if emit_callback:
             emit_callback('chatbot_stream_status', {'status': 'Fetching relevant data...'})
         
-        if any(word in query_lower for word in ['recent', 'latest', 'new', 'today']):
+        matches = _INTENT_RE.findall(query_lower)
+        intent = min((_WORD_TO_INTENT[w] for w in matches),
+                     key=_INTENT_PRIORITY.get, default='default')
+        
+        if intent == 'stats':
+            stats = self.db.get_statistics()
+            return self._generate_stats_response_stream(user_query, stats, emit_callback)
+        
+        if intent == 'recent':
             relevant_data = self.db.get_recent_sitreps(24)
             data_context = "recent SITREPs from the last 24 hours"
-        elif any(word in query_lower for word in ['critical', 'high', 'urgent']):
-            relevant_data = self.db.get_sitreps_by_severity('Critical') + self.db.get_sitreps_by_severity('High')
+        elif intent == 'severity':
+            relevant_data = self.db.get_sitreps_by_severities(['Critical', 'High'])
             data_context = "high and critical severity SITREPs"
-        elif any(word in query_lower for word in ['ongoing', 'active']):
+        elif intent == 'ongoing':
             relevant_data = self.db.get_sitreps_by_status('ongoing')
             data_context = "ongoing SITREPs"
-        elif any(word in query_lower for word in ['resolved', 'completed', 'closed']):
+        elif intent == 'resolved':
             relevant_data = self.db.get_sitreps_by_status('resolved')
             data_context = "resolved SITREPs"
-        elif any(word in query_lower for word in ['statistics', 'stats', 'summary', 'overview']):
-            stats = self.db.get_statistics()
-            return self._generate_stats_response_stream(user_query, stats, emit_callback)
         else:
             relevant_data = self.db.get_recent_sitreps(720)
             data_context = "recent SITREPs from the last 30 days"
@@ -415,18 +519,19 @@ class SitrepChatbot:
                 'is_mapping_query': is_mapping_query
             }
         
-        llm_response = self._generate_llm_response_stream_with_context(user_query, relevant_data, data_context, session_id, emit_callback)
+        llm_response = self._generate_llm_response_stream_with_context(
+            user_query, relevant_data, data_context, session_id, emit_callback,
+            history=history_future.result() if history_future else None
+        )
+        self._remember_turn(session_id, user_query, llm_response)
         
-        # Save conversation to database
-        try:
-            save_conversation_message(session_id, user_query, llm_response, json.dumps({
-                "data_count": len(relevant_data),
-                "data_context": data_context,
-                "has_coordinates": len(coordinates) > 0,
-                "is_mapping_query": is_mapping_query
-            }))
-        except Exception as e:
-            print(f"Warning: Failed to save conversation: {e}")
+        # Persisted by the background writer off the request path
+        queue_conversation_message(session_id, user_query, llm_response, orjson.dumps({
+            "data_count": len(relevant_data),
+            "data_context": data_context,
+            "has_coordinates": len(coordinates) > 0,
+            "is_mapping_query": is_mapping_query
+        }).decode())
         
         return {
             'user_query': user_query,
@@ -445,8 +550,6 @@ class SitrepChatbot:
         if not self.llm:
             return "LLM not configured."
         data_summary = self._prepare_data_summary(data)
-        system_prompt = """You are a helpful assistant analyzing SITREP (Situation Report) data for military/emergency operations. 
-        Your role is to analyze provided SITREP data, answer questions clearly, highlight patterns/trends, and provide actionable insights. Be factual and base responses on the provided data."""
         user_prompt = f"""
         User Question: {user_query}
         Context: I'm providing you with {context}.
@@ -455,31 +558,19 @@ class SitrepChatbot:
         Please analyze this data and provide a helpful response to the user's question.
         """
         messages = [
-            {"role": "system", "content": system_prompt},
+            {"role": "system", "content": _SYSTEM_PROMPT},
             {"role": "user", "content": user_prompt}
         ]
         return self.llm.chat_completion_stream(messages, callback=emit_callback)
     
-    def _generate_llm_response_stream_with_context(self, user_query: str, data: List[Dict], context: str, session_id: str, emit_callback=None) -> str:
+    def _generate_llm_response_stream_with_context(self, user_query: str, data: List[Dict], context: str, session_id: str, emit_callback=None, history: List[Dict] = None) -> str:
         """Generate streaming LLM response based on query, data, and conversation history"""
         if not self.llm:
             return "LLM not configured."
         
-        # Get recent conversation history for context
-        conversation_history = get_recent_conversations(session_id, count=5)
-        
         data_summary = self._prepare_data_summary(data)
-        system_prompt = """You are a helpful assistant analyzing SITREP (Situation Report) data for military/emergency operations. 
-        Your role is to analyze provided SITREP data, answer questions clearly, highlight patterns/trends, and provide actionable insights. Be factual and base responses on the provided data.
-        
-        You have access to the conversation history to maintain context and provide more relevant responses. Reference previous exchanges when appropriate."""
-        
-        messages = [{"role": "system", "content": system_prompt}]
-        
-        # Add conversation history to messages
-        for conv in conversation_history:
-            messages.append({"role": "user", "content": conv["user_message"]})
-            messages.append({"role": "assistant", "content": conv["bot_response"]})
+        messages = [{"role": "system", "content": _SYSTEM_PROMPT_CONTEXT}]
+        messages.extend(self._history_messages(session_id, history))
         
         # Add current query with data context
         user_prompt = f"""
@@ -503,19 +594,18 @@ class SitrepChatbot:
                 'llm_response': 'LLM not configured. Statistics computed without AI analysis.',
                 'data_count': stats.get('total_sitreps', 0)
             }
-        system_prompt = "You are analyzing SITREP database statistics. Provide a clear, informative summary of the data patterns and key insights."
         user_prompt = f"""
         User Question: {user_query}
         Database Statistics:
         - Total SITREPs: {stats['total_sitreps']}
         - Recent (24h): {stats['recent_24h']}
-        - By Severity: {json.dumps(stats['by_severity'], indent=2)}
-        - By Status: {json.dumps(stats['by_status'], indent=2)}
-        - By Incident Type: {json.dumps(stats['by_incident_type'], indent=2)}
+        - By Severity: {_dj(stats['by_severity'])}
+        - By Status: {_dj(stats['by_status'])}
+        - By Incident Type: {_dj(stats['by_incident_type'])}
         Please provide an analysis of these statistics.
         """
         messages = [
-            {"role": "system", "content": system_prompt},
+            {"role": "system", "content": _STATS_SYSTEM_PROMPT},
             {"role": "user", "content": user_prompt}
         ]
         llm_response = self.llm.chat_completion_stream(messages, callback=emit_callback)
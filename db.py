@@ -0,0 +1,37 @@
+"""
+Shared SQLite access for the sitreps.db maintenance scripts
+Resolves the database path relative to this file (not the CWD) and hands out
+one tuned connection per thread.
+"""
+import os
+import sqlite3
+import threading
+
+DB_PATH = os.path.join(os.path.dirname(__file__), "sitreps.db")
+
+# Applied once per connection: WAL for concurrent readers/writers, NORMAL to
+# halve fsyncs per commit, plus a 64 MB page cache and a 256 MB mmap window
+# for scan-heavy analysis runs.
+PRAGMAS = (
+    "PRAGMA journal_mode=WAL;"
+    "PRAGMA synchronous=NORMAL;"
+    "PRAGMA temp_store=MEMORY;"
+    "PRAGMA cache_size=-65536;"
+    "PRAGMA mmap_size=268435456;"
+)
+
+_local = threading.local()
+
+def get_conn():
+    """Return this thread's sitreps.db connection, creating it on first use.
+
+    Thread-local reuse means repeat callers skip the connect + pragma setup
+    cost; connections live for the lifetime of the process.
+    """
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        conn = sqlite3.connect(DB_PATH)
+        conn.executescript(PRAGMAS)
+        conn.row_factory = sqlite3.Row
+        _local.conn = conn
+    return conn
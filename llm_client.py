@@ -93,7 +93,11 @@ class LMStudioClient(LLMClient):
             )
             response.raise_for_status()
             
-            full_response = ""
+            # Collect deltas in a list and join once at the end; the old
+            # running str concat rebuilt the whole transcript per token.
+            # The callback gets just the delta — consumers that need the
+            # cumulative text assemble it on their side.
+            parts = []
             
             for line in response.iter_lines():
                 if line:
@@ -111,14 +115,14 @@ class LMStudioClient(LLMClient):
                                 content = delta.get('content', '')
                                 
                                 if content:
-                                    full_response += content
+                                    parts.append(content)
                                     if callback:
-                                        callback('chatbot_stream_chunk', {'partial_response': full_response})
+                                        callback('chatbot_stream_token', {'token': content})
                         
                         except json.JSONDecodeError:
                             continue
             
-            return full_response
+            return ''.join(parts)
         
         except Exception as e:
             error_msg = f"Error communicating with LM Studio: {str(e)}"
@@ -135,6 +139,11 @@ class OpenRouterClient(LLMClient):
         self.base_url = base_url.rstrip('/')
         self.model_name = model_name
         self.session = requests.Session()
+        # Pooled keep-alive connections: repeat calls reuse the TCP+TLS
+        # connection instead of paying the handshake every time
+        adapter = requests.adapters.HTTPAdapter(pool_connections=10, pool_maxsize=10)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
         self.session.headers.update({
             "Authorization": f"Bearer {api_key}",
             "Content-Type": "application/json",
@@ -201,7 +210,11 @@ class OpenRouterClient(LLMClient):
             )
             response.raise_for_status()
             
-            full_response = ""
+            # Collect deltas in a list and join once at the end; the old
+            # running str concat rebuilt the whole transcript per token.
+            # The callback gets just the delta — consumers that need the
+            # cumulative text assemble it on their side.
+            parts = []
             
             for line in response.iter_lines():
                 if line:
@@ -219,14 +232,14 @@ class OpenRouterClient(LLMClient):
                                 content = delta.get('content', '')
                                 
                                 if content:
-                                    full_response += content
+                                    parts.append(content)
                                     if callback:
-                                        callback('chatbot_stream_chunk', {'partial_response': full_response})
+                                        callback('chatbot_stream_token', {'token': content})
                         
                         except json.JSONDecodeError:
                             continue
             
-            return full_response
+            return ''.join(parts)
         
         except Exception as e:
             error_msg = f"Error communicating with OpenRouter: {str(e)}"
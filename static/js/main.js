@@ -1651,6 +1651,20 @@ window.addEventListener("click", (e) => {
     convertFileInput.value = "";
   }
 });
+// /convert now answers 202 with a job id; poll the status URL until the
+// background conversion reaches a terminal state.
+async function pollConvertStatus(statusUrl, intervalMs = 1500, timeoutMs = 120000) {
+  const deadline = Date.now() + timeoutMs;
+  while (Date.now() < deadline) {
+    const response = await fetch(statusUrl);
+    const result = await response.json();
+    if (!response.ok) throw new Error(result.error || `Conversion failed (HTTP ${response.status})`);
+    if (result.status !== "pending") return result;
+    await new Promise((resolve) => setTimeout(resolve, intervalMs));
+  }
+  throw new Error("Timed out waiting for the conversion to finish.");
+}
+
 convertForm.addEventListener("submit", async (e) => {
   e.preventDefault();
   const file = convertFileInput.files[0];
@@ -1663,11 +1677,15 @@ convertForm.addEventListener("submit", async (e) => {
   try {
     const response = await fetch("/convert", { method: "POST", body: formData });
     const result = await response.json();
-    if (response.ok) alert(`File converted successfully: ${result.geojson_file}`);
-    else alert(`Error during conversion: ${result.error}`);
+    if (!response.ok) {
+      alert(`Error during conversion: ${result.error}`);
+      return;
+    }
+    const job = await pollConvertStatus(result.status_url);
+    alert(`File converted successfully: ${job.geojson_file}`);
   } catch (error) {
     console.error("Error:", error);
-    alert("An unexpected error occurred.");
+    alert(`Error during conversion: ${error.message || "An unexpected error occurred."}`);
   } finally {
     convertModal.style.display = "none";
     if (modalOverlay) modalOverlay.style.display = "none";
@@ -2,34 +2,53 @@
 Supabase client module for database operations and storage
 """
 import os
+import sys
+import gzip
+import queue
+import threading
+import time
 import json
+import bcrypt
+import orjson
 from supabase import create_client, Client
 from storage3.utils import StorageException
 
+# Cached client instances so every caller shares one underlying HTTP session.
+# Reusing the session keeps connections alive between requests, avoiding a
+# fresh TCP+TLS handshake for each Supabase call.
+_supabase_client = None
+_admin_supabase_client = None
+
 def get_supabase_client() -> Client:
     """
-    Create and return a Supabase client instance (for read operations)
+    Return the shared Supabase client instance (for read operations)
     """
-    url = os.environ.get("SUPABASE_URL")
-    key = os.environ.get("SUPABASE_ANON_KEY")
-    
-    if not url or not key:
-        raise ValueError("SUPABASE_URL and SUPABASE_ANON_KEY must be set in environment variables")
-    
-    return create_client(url, key)
+    global _supabase_client
+    if _supabase_client is None:
+        url = os.environ.get("SUPABASE_URL")
+        key = os.environ.get("SUPABASE_ANON_KEY")
+
+        if not url or not key:
+            raise ValueError("SUPABASE_URL and SUPABASE_ANON_KEY must be set in environment variables")
+
+        _supabase_client = create_client(url, key)
+    return _supabase_client
 
 def get_admin_supabase_client() -> Client:
     """
-    Create and return a Supabase client with service role key (for write operations)
+    Return the shared Supabase client with service role key (for write operations)
     """
-    url = os.environ.get("SUPABASE_URL")
-    service_key = os.environ.get("SUPABASE_SERVICE_ROLE_KEY")
-    
-    if not url or not service_key:
-        # Fall back to anonymous client if service key not available
-        return get_supabase_client()
-    
-    return create_client(url, service_key)
+    global _admin_supabase_client
+    if _admin_supabase_client is None:
+        url = os.environ.get("SUPABASE_URL")
+        service_key = os.environ.get("SUPABASE_SERVICE_ROLE_KEY")
+
+        if not url or not service_key:
+            # Fall back to anonymous client if service key not available
+            return get_supabase_client()
+
+        _admin_supabase_client = create_client(url, service_key)
+    return _admin_supabase_client
 
 def get_storage_client():
     """
@@ -45,9 +64,9 @@ def get_admin_storage_client():
     supabase = get_admin_supabase_client()
     return supabase.storage
 
-def get_sitreps(filters=None):
+def _sitreps_query(filters=None):
     """
-    Get sitreps from Supabase with optional filters
+    Base sitreps select with the standard filters applied
     """
     supabase = get_supabase_client()
     query = supabase.table("sitreps").select("*")
@@ -63,6 +82,27 @@ def get_sitreps(filters=None):
             categories = filters["source_category"].split(",")
             query = query.in_("source_category", categories)
     
+    return query
+
+def _intern_labels(rows):
+    """
+    Intern the small fixed label columns (severity, status,
+    source_category) so the counting loops downstream compare cached
+    hashes and pointers instead of re-hashing fresh JSON strings per row
+    """
+    for row in rows:
+        for key in ('severity', 'status', 'source_category'):
+            value = row.get(key)
+            if type(value) is str:
+                row[key] = sys.intern(value)
+    return rows
+
+def get_sitreps(filters=None):
+    """
+    Get sitreps from Supabase with optional filters
+    """
+    query = _sitreps_query(filters)
+    
     # Order by created_at descending (fallback to id if column missing)
     try:
         query = query.order("created_at", desc=True)
@@ -70,7 +110,35 @@ def get_sitreps(filters=None):
         query = query.order("id", desc=True)
     
     response = query.execute()
-    return response.data
+    return _intern_labels(response.data or [])
+
+def iter_sitreps(filters=None, page_size=1000):
+    """
+    Yield sitreps in pages using PostgREST range paging.
+
+    Callers that aggregate row by row keep peak memory at O(page_size)
+    instead of buffering the whole table. Pages are ordered by id
+    ascending so rows inserted mid-iteration (higher ids) cannot shift
+    earlier pages.
+    """
+    offset = 0
+    while True:
+        query = _sitreps_query(filters).order("id", desc=False).range(offset, offset + page_size - 1)
+        data = query.execute().data or []
+        if data:
+            yield _intern_labels(data)
+        if len(data) < page_size:
+            return
+        offset += page_size
+
+def count_sitreps():
+    """
+    Count sitreps without transferring any rows (exact count comes back
+    in the Content-Range header of a HEAD request)
+    """
+    supabase = get_supabase_client()
+    response = supabase.table("sitreps").select("id", count="exact", head=True).execute()
+    return response.count or 0
 
 def insert_sitrep(sitrep_data):
     """
@@ -146,6 +214,17 @@ def ensure_layers_bucket():
             print("See SUPABASE_BUCKET_SETUP.md for detailed setup instructions.")
             return False
 
+def _encode_layer_payload(geojson_data):
+    """Serialize a GeoJSON dict and gzip it for bucket storage.
+
+    GeoJSON compresses 5-15x (repeated "type"/"coordinates" keys), so the
+    upload moves proportionally less data; the content-encoding metadata
+    lets browsers and httpx transparently decompress on fetch.
+    """
+    body = gzip.compress(orjson.dumps(geojson_data), compresslevel=3)
+    options = {"content-type": "application/geo+json", "content-encoding": "gzip"}
+    return body, options
+
 def upload_layer_to_bucket(layer_name, geojson_data):
     """
     Upload a layer (GeoJSON) to Supabase storage bucket
@@ -165,16 +244,15 @@ def upload_layer_to_bucket(layer_name, geojson_data):
         if not ensure_layers_bucket():
             return {"error": "Failed to ensure bucket exists"}
         
-        # Convert GeoJSON to string
-        geojson_str = json.dumps(geojson_data, ensure_ascii=False, indent=2)
-        geojson_bytes = geojson_str.encode('utf-8')
+        # Serialize once and gzip before it crosses the wire
+        geojson_bytes, file_options = _encode_layer_payload(geojson_data)
         
         # Upload file
         file_path = f"{layer_name}.geojson"
         response = storage.from_(LAYERS_BUCKET).upload(
             file_path, 
             geojson_bytes,
-            {"content-type": "application/json"}
+            file_options
         )
         
         return {"success": True, "path": response.path}
@@ -201,16 +279,15 @@ def update_layer_in_bucket(layer_name, geojson_data):
         # Use admin storage client for write operations
         storage = get_admin_storage_client()
         
-        # Convert GeoJSON to string
-        geojson_str = json.dumps(geojson_data, ensure_ascii=False, indent=2)
-        geojson_bytes = geojson_str.encode('utf-8')
+        # Serialize once and gzip before it crosses the wire
+        geojson_bytes, file_options = _encode_layer_payload(geojson_data)
         
         # Update file
         file_path = f"{layer_name}.geojson"
         response = storage.from_(LAYERS_BUCKET).update(
             file_path, 
             geojson_bytes,
-            {"content-type": "application/json"}
+            file_options
         )
         
         return {"success": True, "path": response.path}
@@ -233,8 +310,12 @@ def download_layer_from_bucket(layer_name):
         file_path = f"{layer_name}.geojson"
         response = storage.from_(LAYERS_BUCKET).download(file_path)
         
-        # Parse the downloaded bytes as JSON
-        geojson_data = json.loads(response.decode('utf-8'))
+        # Parse the downloaded bytes as JSON. The transport normally
+        # decompresses via the content-encoding metadata; gunzip manually if
+        # the raw gzip bytes came through (magic number 1f 8b).
+        if response[:2] == b'\x1f\x8b':
+            response = gzip.decompress(response)
+        geojson_data = orjson.loads(response)
         return {"success": True, "data": geojson_data}
     except Exception as e:
         return {"error": f"Download failed: {str(e)}"}
@@ -313,6 +394,50 @@ def save_conversation_message(session_id, user_message, bot_response, context_da
     else:
         return {"status": "error", "message": "Failed to save conversation"}
 
+# Conversation writes are fire-and-forget: the chat turn has already been
+# answered by the time the row is persisted, so messages queue up for a
+# single background worker that inserts them in batches — one PostgREST
+# call per flush instead of one blocking call per message
+_CONV_QUEUE = queue.Queue()
+_CONV_FLUSH_ROWS = 20
+_CONV_FLUSH_SECS = 0.5
+_conv_writer_started = False
+_conv_writer_lock = threading.Lock()
+
+def _conversation_writer():
+    buf = []
+    last_flush = time.monotonic()
+    while True:
+        timeout = max(0.05, _CONV_FLUSH_SECS - (time.monotonic() - last_flush))
+        try:
+            buf.append(_CONV_QUEUE.get(timeout=timeout))
+        except queue.Empty:
+            pass
+        if buf and (len(buf) >= _CONV_FLUSH_ROWS or time.monotonic() - last_flush >= _CONV_FLUSH_SECS):
+            rows, buf = buf, []
+            last_flush = time.monotonic()
+            try:
+                get_supabase_client().table("chatbot_conversations").insert(rows).execute()
+            except Exception as e:
+                print(f"⚠️ Failed to save {len(rows)} conversation message(s): {e}")
+
+def queue_conversation_message(session_id, user_message, bot_response, context_data=None):
+    """
+    Queue a conversation message for background batched insertion
+    """
+    global _conv_writer_started
+    if not _conv_writer_started:
+        with _conv_writer_lock:
+            if not _conv_writer_started:
+                threading.Thread(target=_conversation_writer, daemon=True).start()
+                _conv_writer_started = True
+    _CONV_QUEUE.put({
+        "session_id": session_id,
+        "user_message": user_message,
+        "bot_response": bot_response,
+        "context_data": context_data
+    })
+
 def get_recent_conversations(session_id, count=5):
     """
     Get recent conversation messages for context
@@ -340,10 +465,18 @@ def authenticate_user(username, password):
     """
     try:
         supabase = get_admin_supabase_client()  # Use admin client for authentication
-        response = supabase.table("users").select("*").eq("username", username).eq("password", password).execute()
-        
+        response = supabase.table("users").select("*").eq("username", username).execute()
+
         if response.data and len(response.data) > 0:
             user = response.data[0]
+            stored = user.get('password') or ''
+            # Bcrypt-hashed passwords are verified locally; plaintext rows
+            # from before hashing was introduced are compared directly
+            if stored.startswith('$2'):
+                if not bcrypt.checkpw(password.encode('utf-8'), stored.encode('utf-8')):
+                    return None
+            elif stored != password:
+                return None
             # Don't return password in user data
             user.pop('password', None)
             return user
@@ -360,7 +493,7 @@ def create_user(username, password, email=None, role="user"):
         supabase = get_admin_supabase_client()
         user_data = {
             "username": username,
-            "password": password,  # In production, this should be hashed
+            "password": bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds=10)).decode('utf-8'),
             "email": email,
             "role": role,
             "created_at": "now()"
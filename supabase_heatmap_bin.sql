@@ -0,0 +1,63 @@
+-- Grid aggregation for /api/sitreps/heatmap, run once in the Supabase SQL
+-- editor. Bins sitreps into grid cells and aggregates counts, severity
+-- weights and per-cell source/severity breakdowns in Postgres, so the API
+-- transfers O(cells) instead of every sitrep row.
+--
+-- Cell keys use round(coord / grid_size) to match the fallback aggregation
+-- in app.py (_bin_heat), so both paths produce identical cells.
+
+create or replace function heatmap_bin(
+    grid_size float8,
+    from_date timestamptz default null,
+    to_date timestamptz default null,
+    cats text[] default null
+)
+returns table (
+    gy float8,
+    gx float8,
+    cnt bigint,
+    wsum float8,
+    src_json jsonb,
+    sev_json jsonb
+)
+language sql
+stable
+as $$
+    with pts as (
+        select
+            round(lat / grid_size) * grid_size as gy,
+            round(lon / grid_size) * grid_size as gx,
+            case lower(coalesce(severity, 'unknown'))
+                when 'critical' then 5
+                when 'high' then 4
+                when 'medium' then 3
+                when 'low' then 2
+                else 1
+            end as weight,
+            coalesce(source_category, 'unknown') as src,
+            coalesce(severity, 'unknown') as sev
+        from sitreps
+        where lat is not null
+          and lon is not null
+          and (from_date is null or created_at >= from_date)
+          and (to_date is null or created_at <= to_date)
+          and (cats is null or lower(source_category) = any(cats))
+    ),
+    src_counts as (
+        select gy, gx, src, count(*) as c from pts group by 1, 2, 3
+    ),
+    sev_counts as (
+        select gy, gx, sev, count(*) as c from pts group by 1, 2, 3
+    )
+    select
+        p.gy,
+        p.gx,
+        count(*) as cnt,
+        sum(p.weight)::float8 as wsum,
+        (select jsonb_object_agg(s.src, s.c) from src_counts s
+          where s.gy = p.gy and s.gx = p.gx) as src_json,
+        (select jsonb_object_agg(s.sev, s.c) from sev_counts s
+          where s.gy = p.gy and s.gx = p.gx) as sev_json
+    from pts p
+    group by p.gy, p.gx
+$$;
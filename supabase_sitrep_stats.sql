@@ -0,0 +1,87 @@
+-- Aggregations for /api/sitreps/stats, run once in the Supabase SQL editor.
+-- Each function does its group-by inside Postgres so the API receives a
+-- handful of (label, count) tuples instead of every sitrep row. All five
+-- share the same filter signature; label normalization (lowercasing,
+-- fallback labels) matches the Python fallback in app.py.
+
+create or replace function sitrep_stats_by_day(
+    from_ts timestamptz default null,
+    to_ts timestamptz default null,
+    cats text[] default null
+)
+returns table (day text, count bigint)
+language sql stable as $$
+    select to_char(date_trunc('day', created_at), 'YYYY-MM-DD'), count(*)
+    from sitreps
+    where created_at is not null
+      and (from_ts is null or created_at >= from_ts)
+      and (to_ts is null or created_at <= to_ts)
+      and (cats is null or lower(source_category) = any(cats))
+    group by 1
+    order by 1
+$$;
+
+create or replace function sitrep_stats_by_severity(
+    from_ts timestamptz default null,
+    to_ts timestamptz default null,
+    cats text[] default null
+)
+returns table (severity text, count bigint)
+language sql stable as $$
+    select lower(coalesce(severity, 'unknown')), count(*)
+    from sitreps
+    where (from_ts is null or created_at >= from_ts)
+      and (to_ts is null or created_at <= to_ts)
+      and (cats is null or lower(source_category) = any(cats))
+    group by 1
+    order by 2 desc
+$$;
+
+create or replace function sitrep_stats_by_source_category(
+    from_ts timestamptz default null,
+    to_ts timestamptz default null,
+    cats text[] default null
+)
+returns table (source_category text, count bigint)
+language sql stable as $$
+    select lower(coalesce(source_category, 'other')), count(*)
+    from sitreps
+    where (from_ts is null or created_at >= from_ts)
+      and (to_ts is null or created_at <= to_ts)
+      and (cats is null or lower(source_category) = any(cats))
+    group by 1
+    order by 2 desc
+$$;
+
+create or replace function sitrep_stats_by_status(
+    from_ts timestamptz default null,
+    to_ts timestamptz default null,
+    cats text[] default null
+)
+returns table (status text, count bigint)
+language sql stable as $$
+    select lower(coalesce(status, 'unknown')), count(*)
+    from sitreps
+    where (from_ts is null or created_at >= from_ts)
+      and (to_ts is null or created_at <= to_ts)
+      and (cats is null or lower(source_category) = any(cats))
+    group by 1
+    order by 2 desc
+$$;
+
+create or replace function sitrep_stats_top_units(
+    from_ts timestamptz default null,
+    to_ts timestamptz default null,
+    cats text[] default null
+)
+returns table (unit text, count bigint)
+language sql stable as $$
+    select coalesce(unit, 'Unspecified'), count(*)
+    from sitreps
+    where (from_ts is null or created_at >= from_ts)
+      and (to_ts is null or created_at <= to_ts)
+      and (cats is null or lower(source_category) = any(cats))
+    group by 1
+    order by 2 desc
+    limit 10
+$$;
@@ -0,0 +1,30 @@
+"""
+Smoke test for the provisioned SAM UN user accounts
+Authenticates each account against Supabase; run after add_new_users.py.
+Run directly: python test_new_users.py
+"""
+from concurrent.futures import ThreadPoolExecutor
+
+from add_new_users import NEW_USERS
+from supabase_client import authenticate_user
+
+def test_new_users():
+    """Authenticate all provisioned accounts concurrently and report results."""
+    credentials = [(u["username"], u["password"]) for u in NEW_USERS]
+
+    # Each authentication is a network round-trip to Supabase; running them in
+    # a small thread pool overlaps the latency so wall-clock stays ~1 RTT.
+    with ThreadPoolExecutor(max_workers=len(credentials)) as pool:
+        results = list(pool.map(lambda c: (c[0], authenticate_user(*c)), credentials))
+
+    for username, user in results:
+        if user:
+            print(f"✅ {username}: authenticated (role={user.get('role', 'user')})")
+        else:
+            print(f"⚠️ {username}: authentication failed")
+
+    failed = sum(1 for _, user in results if not user)
+    print(f"{len(results) - failed}/{len(results)} accounts authenticated")
+
+if __name__ == "__main__":
+    test_new_users()